@@ -0,0 +1,225 @@
+# benchmark_tts.py
+"""
+Benchmark do NeuralTTS na CPU: compara os perfis de inferência (CPU_PROFILES)
+contra o baseline float32 ("default") com um conjunto fixo de frases em PT-BR.
+
+Para cada perfil mostra:
+  - RTF (real-time factor) = tempo de síntese / duração do áudio (menor é melhor)
+  - memória (RSS) logo após carregar o modelo e pico de RSS do processo
+  - similaridade com o baseline (correlação do envelope RMS + razão de duração),
+    com a média e a pior frase; perfis com alguma frase abaixo de --min-corr
+    são marcados e o script sai com código 1
+
+Cada perfil roda em um subprocesso separado, para que threads e pico de RSS
+de um não contaminem o outro.
+
+Uso:
+    python benchmark_tts.py
+    python benchmark_tts.py --profiles default cpu_int8 --out bench_tts
+    python benchmark_tts.py --speaker voices/modo_apresentacao.wav
+    python benchmark_tts.py --min-corr 0.9
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+FRASES = [
+    "Olá! Eu sou JASP, seu assistente de laboratório.",
+    "A temperatura do laboratório agora é de vinte e três graus.",
+    "Para ler um sensor analógico no Arduino, use a função analogRead.",
+    "Luz ligada. Mais alguma coisa?",
+    "Vamos por partes: primeiro conecte o resistor, depois o LED.",
+]
+FRASE_AQUECIMENTO = "Iniciando o teste de voz."
+SEED = 1234
+MIN_CORR_PADRAO = 0.85
+SPEAKER_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "voices", "saudacao.wav")
+
+
+def _rss_mb():
+    """RSS atual do processo em MB (None se não der para medir)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_mb():
+    """Pico de RSS do processo atual em MB (None se não der para medir)."""
+    try:
+        import resource
+    except ImportError:
+        # Windows: precisa do psutil (opcional)
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devolve KB, macOS devolve bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _envelope(wav, frame=512):
+    """Envelope RMS por frame."""
+    n = len(wav) // frame
+    if n == 0:
+        return np.array([np.sqrt(np.mean(wav ** 2))]) if len(wav) else np.zeros(1)
+    frames = wav[: n * frame].reshape(n, frame)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def similaridade(base, outro):
+    """
+    Compara duas falas: correlação dos envelopes RMS (reamostrados para o
+    mesmo tamanho) e razão entre as durações.
+    """
+    env_a, env_b = _envelope(base), _envelope(outro)
+    grid = np.linspace(0.0, 1.0, max(len(env_a), len(env_b)))
+    env_a = np.interp(grid, np.linspace(0.0, 1.0, len(env_a)), env_a)
+    env_b = np.interp(grid, np.linspace(0.0, 1.0, len(env_b)), env_b)
+    if env_a.std() == 0 or env_b.std() == 0:
+        corr = 0.0
+    else:
+        corr = float(np.corrcoef(env_a, env_b)[0, 1])
+    return corr, len(outro) / max(len(base), 1)
+
+
+def run_worker(profile, out_dir, speaker_wav):
+    """Roda a síntese de um perfil e imprime as métricas em JSON (última linha)."""
+    import torch
+    from neuralTTS import NeuralTTS
+
+    tts = NeuralTTS(speaker_wav=speaker_wav, profile=profile)
+    load_rss = _rss_mb()
+    load_peak = _peak_rss_mb()
+    torch.manual_seed(SEED)
+    tts.synthesize(FRASE_AQUECIMENTO)
+
+    os.makedirs(out_dir, exist_ok=True)
+    total_synth = 0.0
+    total_audio = 0.0
+    frases = []
+    for i, frase in enumerate(FRASES):
+        torch.manual_seed(SEED)
+        t0 = time.perf_counter()
+        wav = np.asarray(tts.synthesize(frase), dtype=np.float32)
+        elapsed = time.perf_counter() - t0
+        duration = len(wav) / tts.sample_rate
+
+        np.save(os.path.join(out_dir, f"{i:02d}.npy"), wav)
+        total_synth += elapsed
+        total_audio += duration
+        frases.append({"synth_s": elapsed, "audio_s": duration, "rtf": elapsed / max(duration, 1e-6)})
+
+    print(json.dumps({
+        "profile": profile,
+        "rtf": total_synth / max(total_audio, 1e-6),
+        "synth_s": total_synth,
+        "audio_s": total_audio,
+        "load_rss_mb": load_rss,
+        "load_peak_rss_mb": load_peak,
+        "peak_rss_mb": _peak_rss_mb(),
+        "frases": frases,
+    }))
+
+
+def main():
+    from neuralTTS import CPU_PROFILES
+
+    parser = argparse.ArgumentParser(description="Benchmark dos perfis de CPU do NeuralTTS")
+    parser.add_argument("--profiles", nargs="+", default=list(CPU_PROFILES), choices=list(CPU_PROFILES))
+    parser.add_argument("--out", default="bench_tts", help="pasta para os áudios gerados")
+    parser.add_argument("--speaker", default=SPEAKER_PADRAO, help="wav de referência da voz")
+    parser.add_argument(
+        "--min-corr", type=float, default=MIN_CORR_PADRAO,
+        help="correlação mínima com o baseline em cada frase (padrão: %(default)s)",
+    )
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, os.path.join(args.out, args.worker), args.speaker)
+        return
+
+    # O baseline float32 sempre roda primeiro (referência de similaridade)
+    profiles = ["default"] + [p for p in args.profiles if p != "default"]
+    resultados = {}
+    for profile in profiles:
+        print(f"\n⏱️ Rodando perfil '{profile}'...")
+        proc = subprocess.run(
+            [
+                sys.executable, os.path.abspath(__file__),
+                "--worker", profile, "--out", args.out, "--speaker", args.speaker,
+            ],
+            stdout=subprocess.PIPE,
+            # No Windows o pipe usaria cp1252 e os prints com emoji do NeuralTTS quebrariam
+            env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+            encoding="utf-8",
+        )
+        if proc.returncode != 0:
+            print(f"❌ Perfil '{profile}' falhou (código {proc.returncode})")
+            continue
+        resultados[profile] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    if "default" not in resultados:
+        print("❌ Baseline float32 falhou, sem como comparar.")
+        sys.exit(1)
+
+    def mb(value):
+        return f"{value:.0f} MB" if value is not None else "n/d"
+
+    print("\n" + "-" * 108)
+    print(
+        f"{'perfil':<10} {'RTF':>6} {'síntese':>9} {'áudio':>8} "
+        f"{'RSS carga':>10} {'pico carga':>11} {'pico total':>11} "
+        f"{'corr':>6} {'pior':>6} {'duração':>8}  status"
+    )
+    print("-" * 108)
+    reprovados = []
+    for profile, res in resultados.items():
+        corrs, ratios = [], []
+        for i in range(len(FRASES)):
+            base = np.load(os.path.join(args.out, "default", f"{i:02d}.npy"))
+            outro = np.load(os.path.join(args.out, profile, f"{i:02d}.npy"))
+            corr, ratio = similaridade(base, outro)
+            corrs.append(corr)
+            ratios.append(ratio)
+        pior = int(np.argmin(corrs))
+        ok = corrs[pior] >= args.min_corr
+        if not ok:
+            reprovados.append(profile)
+        print(
+            f"{profile:<10} {res['rtf']:>6.2f} {res['synth_s']:>8.1f}s {res['audio_s']:>7.1f}s "
+            f"{mb(res['load_rss_mb']):>10} {mb(res['load_peak_rss_mb']):>11} {mb(res['peak_rss_mb']):>11} "
+            f"{np.mean(corrs):>6.2f} {corrs[pior]:>6.2f} {np.mean(ratios):>7.2f}x  "
+            f"{'OK' if ok else '❌ DIVERGIU'}"
+        )
+        print(f"{'':<10} pior frase #{pior}: {FRASES[pior]!r} (duração {ratios[pior]:.2f}x)")
+    print("-" * 108)
+    print("RSS carga = memória logo após carregar o modelo; pico carga = pico até ali")
+    print("pico total = pico do processo inteiro (se > pico carga, a síntese subiu o pico)")
+    print("corr = correlação média do envelope RMS com o baseline (1.0 = idêntico)")
+    print("pior = correlação da frase mais distante do baseline")
+    print("duração = duração média em relação ao baseline")
+
+    if reprovados:
+        print(f"\n❌ Perfis abaixo de --min-corr {args.min_corr}: {', '.join(reprovados)}")
+        sys.exit(1)
+    print(f"\n✅ Todos os perfis acima de --min-corr {args.min_corr}")
+
+
+if __name__ == "__main__":
+    main()
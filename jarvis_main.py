@@ -11,14 +11,19 @@ from playsound import playsound
 #from text_to_speech import TextToSpeech
 from arduino_controller import SmartLabController
 
+# Palavras que mandam a pergunta para a busca web antes do LLM
+PALAVRAS_WEB = ["agora", "hoje", "notícia", "cotação", "pesquise ", "previsão do tempo"]
+
 
 class JARVIS:
     def __init__(self):
         print("🤖 Inicializando JASP...")
 
         # Módulos
-        self.stt = SpeechToText()
+        self.stt = SpeechToText(partial_stable_ms=400)
         self.llm = LocalLLM(model="mistral")
+        # Começa a gerar no LLM a partir do parcial estável do Vosk
+        self.speculative = True
         self.tts = NeuralTTS(speaker_wav=r"voices\Apresentacao_Com_recepcao.wav")
         self.arduino = SmartLabController()
 
@@ -42,17 +47,32 @@ class JARVIS:
         playsound(r"voices\iniciando.wav")
         playsound(r"voices\como_posso_ajudalo.wav")
 
+    def is_custom_command(self, text):
+        """Retorna o handler do comando customizado que bate com o texto (ou None)."""
+        for pattern, handler in self.custom_commands.items():
+            if re.search(pattern, text.lower()):
+                return handler
+        return None
+
     def process_voice_input(self, text):
         """Processa entrada de voz"""
         print(f"\n📝 Você: {text}")
 
-        for pattern, handler in self.custom_commands.items():
-            if re.search(pattern, text.lower()):
-                print("🔧 Executando comando customizado...")
-                handler(text)
-                return True
+        handler = self.is_custom_command(text)
+        if handler:
+            print("🔧 Executando comando customizado...")
+            handler(text)
+            return True
         return False
 
+    def on_stable_partial(self, partial):
+        """Parcial do STT estabilizou: adianta a geração no LLM se for pergunta comum."""
+        if len(partial) < 2 or self.is_custom_command(partial):
+            return
+        if any(p in partial.lower() for p in PALAVRAS_WEB):
+            return
+        self.llm.start_speculative(partial)
+
     def busca_web(self, query: str, timeout: float = 10.0) -> str:
         """
         Faz uma busca simples na web usando a API pública do DuckDuckGo Instant Answer.
@@ -112,23 +132,31 @@ class JARVIS:
         try:
             while True:
                 print("\n👂 Escutando...", end=" ", flush=True)
-                text = self.stt.listen()
+                text = self.stt.listen(
+                    on_stable_partial=self.on_stable_partial if self.speculative else None
+                )
 
                 if not text or len(text) < 2:
+                    self.llm.cancel_speculative()
                     continue
 
                 # Comandos customizados
                 if self.process_voice_input(text):
+                    self.llm.cancel_speculative()
                     continue
 
                 # Decidir se precisa de web
-                if any(p in text.lower() for p in ["agora", "hoje", "notícia", "cotação", "pesquise ","previsão do tempo"]):
+                if any(p in text.lower() for p in PALAVRAS_WEB):
+                    self.llm.cancel_speculative()
                     web_info = self.busca_web(text)
                     print("🌐 Info da web:\n", web_info)
                     # assume que você criou answer_with_web no LocalLLM
                     response = self.llm.answer_with_web(text, web_info)
                 else:
-                    response = self.llm.process_message(text)
+                    # Reaproveita a geração especulativa se o final bateu com o parcial
+                    response = self.llm.resolve_speculative(text)
+                    if response is None:
+                        response = self.llm.process_message(text)
                     if getattr(self, "modo_atual", "normal") == "serio":
                         prefixo = random.choice(PREFIXOS_SERIOS)
                         resposta_final = prefixo + response
@@ -182,6 +210,8 @@ class JARVIS:
         print(f"\n📋 Histórico ({len(history)} mensagens):")
         for msg in history[-4:]:
             print(f"  {msg['role']}: {msg['content'][:60]}...")
+        if self.speculative:
+            print(f"  {self.llm.speculative_report()}")
     
     def command_clear_history(self, text):
         self.llm.clear_history()
@@ -240,6 +270,9 @@ class JARVIS:
     def shutdown(self):
         """Encerramento limpo"""
         print("\n\n👋 Desligando JASP...")
+        if self.speculative:
+            self.llm.cancel_speculative()
+            print(self.llm.speculative_report())
         self.tts.speak_blocking("Até logo!")
         self.stt.stop()
         self.arduino.close()
@@ -1,11 +1,65 @@
 import requests
+import http.client
 import json
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def _normalize(text):
+    """Normaliza transcrição para comparar parcial x final."""
+    return " ".join(text.lower().split())
+
+
+def _abort_connection(sock):
+    """
+    Derruba a conexão na hora (acorda a thread presa esperando resposta).
+    O Ollama para de gerar quando o cliente desconecta, inclusive no prefill.
+    """
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+class _SpeculativeRun:
+    """Uma geração especulativa rodando em background a partir de um texto parcial."""
+
+    def __init__(self, text):
+        self.text = text
+        self.key = _normalize(text)
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.chunks = 0
+        self.result = None
+        self.sock = None
+        self.thread = None
+
+    def elapsed(self):
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
 
 class LocalLLM:
     def __init__(self, ollama_url="http://localhost:11434", model="mistral"):
         self.url = ollama_url
         self.model = model
         self.conversation_history = []
+        # Pré-busca especulativa a partir do parcial do STT
+        self._speculative = None
+        self.speculative_stats = {
+            "started": 0,        # gerações especulativas iniciadas
+            "hits": 0,           # final == parcial, resultado aproveitado
+            "misses": 0,         # final != parcial (ou parcial mudou), geração descartada
+            "failed": 0,         # final == parcial, mas a geração falhou
+            "cancelled": 0,      # canceladas por comando/troca de modo/web/desligamento
+            "wasted_seconds": 0.0,  # tempo de geração jogado fora
+            "wasted_chunks": 0,     # tokens (chunks do stream) jogados fora
+            "saved_seconds": 0.0,   # tempo de geração já adiantado nos acertos
+        }
         self.system_prompt = (
             "Você é JASP, um assistente de laboratório de programação e eletrônica. "
             "Você fala como um desenvolvedor experiente, educado, direto e tranquilo. "
@@ -19,6 +73,7 @@ class LocalLLM:
         """
         Deixa o JASP em modo sério: técnico, claro, mas ainda humano.
         """
+        self.cancel_speculative()
         self.system_prompt = (
             "Você é JASP, um assistente técnico sério, calmo e confiável. "
             "Seu foco é ajudar com programação, eletrônica e dúvidas gerais de forma clara e objetiva. "
@@ -73,10 +128,155 @@ class LocalLLM:
         
     def set_system_prompt(self, prompt: str):
         """Permite trocar a personalidade do JASP em tempo real."""
+        self.cancel_speculative()
         self.system_prompt = prompt
         # opcional: limpar histórico para não misturar personalidades
         self.conversation_history = []
 
+    def start_speculative(self, partial_text: str):
+        """
+        Começa a gerar a resposta a partir de um parcial estável do STT, em background.
+        Não mexe no histórico: só entra nele se o texto final confirmar o parcial.
+        """
+        current = self._speculative
+        if current is not None and current.key == _normalize(partial_text):
+            return
+        # O parcial anterior não se confirmou: conta como erro de previsão
+        self.cancel_speculative(reason="misses")
+
+        run = _SpeculativeRun(partial_text)
+        messages = [{"role": "system", "content": self.system_prompt}]
+        messages.extend(self.conversation_history[-5:])
+        messages.append({"role": "user", "content": partial_text})
+
+        run.thread = threading.Thread(
+            target=self._run_speculative, args=(run, messages), daemon=True
+        )
+        self._speculative = run
+        self.speculative_stats["started"] += 1
+        run.thread.start()
+
+    def _run_speculative(self, run, messages):
+        """Thread da geração especulativa (stream, para poder cancelar no meio)."""
+        parts = []
+        # http.client direto (e não requests) para ter o socket desde o connect:
+        # o Ollama só manda os headers junto com o 1º token, depois da carga do
+        # modelo e do prefill, e o cancelamento precisa derrubar a conexão antes disso.
+        url = urlsplit(self.url)
+        conn_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        conn = conn_class(url.hostname, url.port, timeout=120)
+        try:
+            conn.connect()
+            # Guarda o socket em si: o http.client pode soltar conn.sock depois do getresponse
+            run.sock = conn.sock
+            # Cancelado durante o connect (cancel_speculative ainda não via o socket)
+            if run.cancel_event.is_set():
+                return
+            body = json.dumps({
+                "model": self.model,
+                "messages": messages,
+                "stream": True,
+                "temperature": 0.7,
+            })
+            conn.request(
+                "POST",
+                f"{url.path.rstrip('/')}/api/chat",
+                body=body.encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+            )
+            response = conn.getresponse()
+            if run.cancel_event.is_set() or response.status != 200:
+                return
+            while True:
+                line = response.readline()
+                # Fechar a conexão faz o Ollama parar de gerar
+                if run.cancel_event.is_set() or not line:
+                    return
+                line = line.strip()
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    print(f"Erro na geração especulativa: {chunk['error']}")
+                    return
+                parts.append(chunk.get("message", {}).get("content", ""))
+                run.chunks += 1
+                if chunk.get("done"):
+                    # Só aproveita resposta que o Ollama terminou de verdade
+                    if not run.cancel_event.is_set():
+                        run.result = "".join(parts)
+                    return
+        except Exception as e:
+            if not run.cancel_event.is_set():
+                print(f"Erro na geração especulativa: {e}")
+        finally:
+            conn.close()
+            run.finished_at = time.monotonic()
+            run.done_event.set()
+
+    def cancel_speculative(self, reason="cancelled"):
+        """
+        Cancela a geração especulativa em andamento (contabiliza como desperdício).
+        reason: "misses" quando o parcial errou a previsão; "cancelled" para
+        cancelamentos que não dizem nada sobre o parcial (comando, modo, web...).
+        """
+        run = self._speculative
+        if run is None:
+            return
+        self._speculative = None
+        # Evento antes do socket: se o connect ainda não terminou, a thread
+        # vê o evento logo depois dele e desiste sem mandar o pedido
+        run.cancel_event.set()
+        if run.sock is not None:
+            _abort_connection(run.sock)
+        self._discard(run, reason)
+
+    def _discard(self, run, reason):
+        """Contabiliza uma geração especulativa jogada fora."""
+        self.speculative_stats[reason] += 1
+        self.speculative_stats["wasted_seconds"] += run.elapsed()
+        self.speculative_stats["wasted_chunks"] += run.chunks
+
+    def resolve_speculative(self, final_text: str):
+        """
+        Confere o texto final contra o parcial especulado.
+        Se bater, espera a geração terminar e devolve a resposta (já no histórico).
+        Se não bater (ou falhar), cancela e devolve None para o chamador gerar de novo.
+        """
+        run = self._speculative
+        if run is None:
+            return None
+        if run.key != _normalize(final_text):
+            self.cancel_speculative(reason="misses")
+            return None
+
+        saved = run.elapsed()
+        run.done_event.wait()
+        self._speculative = None
+        if run.result is None:
+            self._discard(run, "failed")
+            return None
+
+        self.speculative_stats["hits"] += 1
+        self.speculative_stats["saved_seconds"] += saved
+        self.conversation_history.append({"role": "user", "content": final_text})
+        self.conversation_history.append({"role": "assistant", "content": run.result})
+        return run.result
+
+    def speculative_report(self) -> str:
+        """Resumo das métricas da pré-busca (para ajustar partial_stable_ms)."""
+        st = self.speculative_stats
+        # Taxa de acerto só considera previsões julgadas pelo texto final
+        predicted = st["hits"] + st["misses"]
+        hit_rate = (st["hits"] / predicted * 100) if predicted else 0.0
+        return (
+            f"Especulação: {st['started']} iniciadas, {st['hits']} acertos, "
+            f"{st['misses']} erros ({hit_rate:.0f}% de acerto), "
+            f"{st['failed']} falhas, {st['cancelled']} canceladas | "
+            f"desperdício: {st['wasted_seconds']:.1f}s / {st['wasted_chunks']} tokens | "
+            f"ganho: {st['saved_seconds']:.1f}s"
+        )
+
     def answer_with_web(self, user_input: str, web_text: str):
         """
         Faz o LLM responder usando o texto da web como contexto adicional.
@@ -91,6 +291,7 @@ class LocalLLM:
     
     def clear_history(self):
         """Limpa histórico de conversa"""
+        self.cancel_speculative()
         self.conversation_history = []
 
 # Uso
@@ -2,38 +2,146 @@
 from TTS.api import TTS
 import torch
 from playsound import playsound
+import contextlib
 import os
 import uuid
 
 
+# Perfis de inferência na CPU (escolha por máquina com JASP_TTS_PROFILE).
+#   default  -> comportamento antigo (float32, threads que o torch escolher)
+#   cpu      -> threads fixas + torch.inference_mode
+#   cpu_int8 -> igual ao "cpu" + quantização dinâmica int8 das camadas lineares
+#               do GPT (o HiFi-GAN é quase todo convolução: lá só os fc do
+#               speaker encoder viram int8)
+CPU_PROFILES = {
+    "default": None,
+    "cpu": {"quantize": False},
+    "cpu_int8": {"quantize": True},
+}
+
+
+def _conv1d_to_linear(module):
+    """
+    O GPT do XTTS usa o Conv1D do GPT-2 (transformers), que a quantização
+    dinâmica não enxerga. Troca cada um por um nn.Linear equivalente.
+    """
+    for name, child in module.named_children():
+        if type(child).__name__ == "Conv1D" and hasattr(child, "nf"):
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features, bias=child.bias is not None)
+            linear.weight.data = child.weight.data.t().contiguous()
+            if child.bias is not None:
+                linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+
+
 class NeuralTTS:
-    def __init__(self, speaker_wav=r"voices\Apresentacao_Com_recepcao.wav"):
+    def __init__(self, speaker_wav=r"voices\Apresentacao_Com_recepcao.wav", profile=None):
         """
         TTS neural usando XTTS v2 + sua voz como referência.
         O modelo é carregado 1x aqui (vai demorar um pouco na 1ª vez).
+        profile: um dos CPU_PROFILES; se None usa JASP_TTS_PROFILE (padrão "default").
+        Threads: JASP_TTS_THREADS (intra-op, padrão = o que o torch já usaria,
+        limitado às CPUs liberadas para o processo) e
+        JASP_TTS_INTEROP_THREADS (inter-op, padrão 1).
         """
         self.speaker_wav = speaker_wav
+        self.profile = profile or os.environ.get("JASP_TTS_PROFILE", "default")
+        if self.profile not in CPU_PROFILES:
+            raise ValueError(
+                f"Perfil de TTS desconhecido: {self.profile!r} (use {', '.join(CPU_PROFILES)})"
+            )
+
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        if self.device == "cpu":
+            # Threads precisam ser fixadas antes de carregar o modelo
+            self._set_cpu_threads()
 
         # Modelo multilíngue com clonagem de voz (speaker_wav)
         # Coqui XTTS v2 suporta PT-BR e voz de referência. [web:253]
         self.tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2")
-        if torch.cuda.is_available():
+        if self.device == "cuda":
             print("✅ XTTS usando GPU")
             self.tts = self.tts.to("cuda")
         else:
             print("⚠️ XTTS rodando na CPU")
+            self._quantize_cpu_model()
 
         # Parâmetros básicos
         self.language = "pt"
 
+    def _set_cpu_threads(self):
+        """Fixa as threads intra/inter-op do torch conforme o perfil."""
+        if CPU_PROFILES[self.profile] is None:
+            return
+
+        # Padrão do torch = núcleos físicos (os.cpu_count() conta SMT e as CPUs
+        # do host em container); affinity limita ao que o processo pode usar
+        default_threads = torch.get_num_threads()
+        if hasattr(os, "sched_getaffinity"):
+            default_threads = min(default_threads, len(os.sched_getaffinity(0)))
+        threads = int(os.environ.get("JASP_TTS_THREADS", default_threads))
+        interop = int(os.environ.get("JASP_TTS_INTEROP_THREADS", 1))
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(interop)
+        except RuntimeError:
+            # Só pode ser chamado antes de qualquer trabalho paralelo no processo
+            print("⚠️ Não foi possível fixar as threads inter-op (torch já fez trabalho paralelo)")
+        print(
+            f"⚙️ Perfil de TTS '{self.profile}': {threads} threads intra-op "
+            f"(padrão do torch: {default_threads}), {interop} inter-op"
+        )
+
+    def _quantize_cpu_model(self):
+        """Quantização dinâmica int8 (perfil cpu_int8), depois do modelo carregado."""
+        config = CPU_PROFILES[self.profile]
+        if config is None or not config["quantize"]:
+            return
+
+        # inplace=True: sem deepcopy (não duplica os pesos float32 na carga e
+        # não quebra nos módulos com weight_norm do HiFi-GAN)
+        model = self.tts.synthesizer.tts_model
+        _conv1d_to_linear(model.gpt)
+        torch.ao.quantization.quantize_dynamic(
+            model.gpt, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+        # O decoder é quase todo Conv1d/ConvTranspose1d: só os fc do speaker encoder mudam
+        torch.ao.quantization.quantize_dynamic(
+            model.hifigan_decoder, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+        )
+        print("⚙️ GPT quantizado para int8 (no decoder, só as camadas lineares do speaker encoder)")
+
+    def _inference_context(self):
+        """inference_mode nos perfis de CPU; no default mantém o comportamento antigo."""
+        if CPU_PROFILES[self.profile] is None:
+            return contextlib.nullcontext()
+        return torch.inference_mode()
+
+    @property
+    def sample_rate(self) -> int:
+        return self.tts.synthesizer.output_sample_rate
+
+    def synthesize(self, text: str):
+        """Gera o áudio em memória (lista de amostras float) no sample_rate do modelo."""
+        with self._inference_context():
+            return self.tts.tts(
+                text=text,
+                speaker_wav=self.speaker_wav,
+                language=self.language,
+            )
+
     def _synthesize_to_file(self, text: str, out_path: str):
         """Gera áudio com a sua voz para um arquivo WAV."""
-        self.tts.tts_to_file(
-            text=text,
-            speaker_wav=self.speaker_wav,
-            language=self.language,
-            file_path=out_path,
-        )
+        with self._inference_context():
+            self.tts.tts_to_file(
+                text=text,
+                speaker_wav=self.speaker_wav,
+                language=self.language,
+                file_path=out_path,
+            )
 
     def speak_blocking(self, text: str):
         """Gera áudio com sua voz e toca (bloqueante, como o antigo speak_blocking)."""
@@ -1,11 +1,17 @@
 from vosk import Model, KaldiRecognizer
 import pyaudio
 import json
+import time
 
 
 class SpeechToText:
-    def __init__(self, model_path="./models/vosk-model-small-pt-br-0.3"):
-        """Inicializa o reconhecimento de voz offline"""
+    def __init__(self, model_path="./models/vosk-model-small-pt-br-0.3", partial_stable_ms=400):
+        """
+        Inicializa o reconhecimento de voz offline.
+        partial_stable_ms: tempo que o resultado parcial do Vosk precisa ficar
+        igual para ser considerado estável (usado na pré-busca especulativa do LLM).
+        """
+        self.partial_stable_ms = partial_stable_ms
         self.model = Model(model_path)
         self.recognizer = KaldiRecognizer(self.model, 16000)
 
@@ -20,8 +26,15 @@ class SpeechToText:
         )
         self.stream.start_stream()
 
-    def listen(self):
-        """Escuta contínua e retorna texto quando reconhecido"""
+    def listen(self, on_stable_partial=None):
+        """
+        Escuta contínua e retorna texto quando reconhecido.
+        Se on_stable_partial for passado, ele é chamado (1x por hipótese) com o
+        texto parcial assim que ele ficar estável por partial_stable_ms.
+        """
+        last_partial = ""
+        partial_since = 0.0
+        partial_sent = False
         try:
             while True:
                 # IMPORTANTE: exception_on_overflow=False
@@ -33,6 +46,27 @@ class SpeechToText:
                     text = result.get("text", "").strip()
                     if text:
                         return text
+                    last_partial = ""
+                    partial_sent = False
+                    continue
+
+                if on_stable_partial is None:
+                    continue
+
+                # Parcial: {"partial": "frase em andamento"}
+                partial = json.loads(self.recognizer.PartialResult()).get("partial", "").strip()
+                now = time.monotonic()
+                if partial != last_partial:
+                    last_partial = partial
+                    partial_since = now
+                    partial_sent = False
+                elif (
+                    partial
+                    and not partial_sent
+                    and (now - partial_since) * 1000 >= self.partial_stable_ms
+                ):
+                    partial_sent = True
+                    on_stable_partial(partial)
 
         except KeyboardInterrupt:
             print("Escuta interrompida")